@@ -4,20 +4,91 @@ Serves both the REST API and static frontend files.
 """
 
 import os
-from fastapi import FastAPI
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from dotenv import load_dotenv
 
 from routers.optimize import router as optimize_router
+from services.llm import get_client, prewarm_client, close_client
+from utils.static_cache import load_assets, asset_response
+from utils.responses import ORJSONResponse
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+async def _prewarm() -> None:
+    try:
+        await prewarm_client()
+    except Exception as e:
+        logger.warning("Groq connection prewarm failed: %s", e)
+
+
+def _parser_workers() -> int:
+    """CPUs this process may actually run on, capped by PARSER_WORKERS (default 2)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on Windows / macOS
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, int(os.getenv("PARSER_WORKERS", "2"))))
+
+
+def _parser_context():
+    """
+    Workers must not fork the running event loop. Where available, a
+    forkserver that preloads only services.resume_parser forks them, so
+    they never import this module (FastAPI, static assets, LLM cache).
+    Elsewhere, fall back to "spawn".
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["services.resume_parser"])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the pooled Groq client up front so the first request doesn't pay for it
+    prewarm = None
+    try:
+        get_client()
+    except ValueError as e:
+        logger.warning("Groq client not initialised: %s", e)
+    else:
+        # Open the connection in the background; set GROQ_PREWARM=0 to skip
+        if os.getenv("GROQ_PREWARM", "1").lower() not in ("0", "false", "no"):
+            prewarm = asyncio.create_task(_prewarm())
+    # Resume parsing (lxml / MuPDF) is CPU-bound, so it runs in a small process pool
+    app.state.parser_pool = ProcessPoolExecutor(
+        max_workers=_parser_workers(),
+        mp_context=_parser_context(),
+    )
+    yield
+    if prewarm is not None:
+        prewarm.cancel()
+    app.state.parser_pool.shutdown(wait=False, cancel_futures=True)
+    await close_client()
+
+
+# In production, skip the /docs, /redoc and /openapi.json routes entirely
+IS_PROD = os.getenv("ENV", "").lower() == "prod"
+
 app = FastAPI(
     title="Resume Tailor & ATS Scorer",
     description="Zero-Format-Loss resume optimization powered by Groq (llama-3.3-70b-versatile)",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    openapi_url=None if IS_PROD else "/openapi.json",
+    docs_url=None if IS_PROD else "/docs",
+    redoc_url=None if IS_PROD else "/redoc",
 )
 
 # CORS — allow origins from environment or default to *
@@ -34,39 +105,48 @@ app.add_middleware(
 # API Routes
 app.include_router(optimize_router, prefix="/api")
 
+
+# Must be registered before the SPA catch-all below, which would otherwise swallow it
+@app.get("/api/health", include_in_schema=False)
+async def health():
+    return {"status": "ok", "model": "llama-3.3-70b-versatile", "provider": "Groq"}
+
 # Serve frontend static files
 # In Docker, the path is relative to the workdir /app
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FRONTEND_DIR = os.path.join(BASE_DIR, "..", "frontend")
 
 if os.path.exists(FRONTEND_DIR):
-    app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
+    # Read every asset once at startup; requests are served straight from memory.
+    # HEAD is accepted alongside GET, as StaticFiles did, for uptime probes and CDNs
+    ASSETS = load_assets(FRONTEND_DIR)
+    INDEX = ASSETS.get("index.html")
 
-    @app.get("/")
-    async def serve_frontend():
-        return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
+    @app.api_route("/", methods=["GET", "HEAD"])
+    async def serve_frontend(request: Request):
+        if INDEX is None:
+            return {"error": "Frontend not found"}
+        return asset_response(INDEX, request)
+
+    @app.api_route("/static/{file_path:path}", methods=["GET", "HEAD"])
+    async def serve_static(file_path: str, request: Request):
+        asset = ASSETS.get(file_path)
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return asset_response(asset, request)
 
     # Catch-all for SPA routing
-    @app.get("/{full_path:path}")
-    async def spa_fallback(full_path: str):
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"])
+    async def spa_fallback(full_path: str, request: Request):
         if full_path.startswith("api/"):
             return {"error": "API route not found"}
-            
-        file_path = os.path.join(FRONTEND_DIR, full_path)
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            return FileResponse(file_path)
-            
-        index = os.path.join(FRONTEND_DIR, "index.html")
-        if os.path.exists(index):
-            return FileResponse(index)
-        return {"error": "Frontend not found"}
-
-
-@app.get("/api/health")
-async def health():
-    return {"status": "ok", "model": "llama-3.3-70b-versatile", "provider": "Groq"}
+
+        asset = ASSETS.get(full_path) or INDEX
+        if asset is None:
+            return {"error": "Frontend not found"}
+        return asset_response(asset, request)
+
 
 if __name__ == "__main__":
-    import uvicorn
-    port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    from serve import run
+    run(app)
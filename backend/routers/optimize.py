@@ -2,48 +2,77 @@
 FastAPI optimize router — Analysis and Suggestions only.
 """
 
-import uuid
-import traceback
+import asyncio
+import hashlib
 import logging
 from typing import Optional
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-import fitz
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import orjson
+from cachetools import TTLCache
 
 from services.scraper import scrape_jd, parse_manual_jd
-from services.docx_engine import extract_docx_sections, get_full_docx_text
-from services.pdf_engine_v2 import find_resume_sections
-from services.pdf_engine import get_full_pdf_text
-from services.llm import rewrite_sections, score_resume
+from services.pdf_engine import run_mupdf_in_thread
+from services.resume_parser import parse_resume
+from services.llm import analyze_resume, stream_analyze_resume
 from services.ats_scorer import calculate_keyword_overlap
+from utils.responses import ORJSONResponse
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.post("/optimize")
-async def optimize_resume(
-    file: UploadFile = File(...),
-    jd_url: Optional[str] = Form(None),
-    jd_text: Optional[str] = Form(None),
-):
+# Matches MAX_FILE_MB in the frontend
+MAX_RESUME_BYTES = 10 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Content-addressed cache of full /optimize responses: re-submitting the same
+# resume against the same JD skips parsing and both Groq round-trips
+RESULT_CACHE: TTLCache = TTLCache(maxsize=512, ttl=3600)
+
+
+def _result_key(file_bytes: bytearray, jd_text: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(file_bytes)
+    h.update(b"\x00")
+    h.update(jd_text.encode("utf-8"))
+    return h.hexdigest()
+
+
+async def _read_upload(file: UploadFile) -> bytearray:
+    """Reads the upload in fixed-size chunks, rejecting it as soon as it exceeds the size cap."""
+    buf = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buf += chunk
+        if len(buf) > MAX_RESUME_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Resume exceeds the {MAX_RESUME_BYTES // (1024 * 1024)} MB upload limit.",
+            )
+    return buf
+
+
+async def _prepare(
+    request: Request,
+    file: UploadFile,
+    jd_url: Optional[str],
+    jd_text: Optional[str],
+) -> dict:
     """
-    Pipeline:
-    1. Read resume
-    2. Get JD
-    3. Extract sections
-    4. Generate suggestions via Groq
-    5. Score resume
-    6. Return analysis JSON
+    Shared front half of the pipeline: read the resume, resolve the JD and
+    extract sections. Returns {"cache_key", "cached"} on a cache hit;
+    otherwise also "jd_data", "combined_jd", "sections" and "full_text".
     """
     filename = file.filename or ""
     ext = filename.split(".")[-1].lower() if "." in filename else ""
     if ext not in ("docx", "pdf"):
         raise HTTPException(status_code=400, detail="Only DOCX and PDF files are supported.")
 
-    file_bytes = await file.read()
+    file_bytes = await _read_upload(file)
 
     # --- Get Job Description ---
     if jd_url and jd_url.strip():
-        jd_data = scrape_jd(jd_url.strip())
+        # requests is blocking; keep the scrape off the event loop
+        jd_data = await asyncio.to_thread(scrape_jd, jd_url.strip())
         if jd_data.get("error") and (not jd_text or not jd_text.strip()):
             raise HTTPException(status_code=422, detail=f"JD scraping failed: {jd_data['error']}")
         combined_jd = jd_data["description"] or jd_text or ""
@@ -56,50 +85,146 @@ async def optimize_resume(
     if not combined_jd.strip():
         raise HTTPException(status_code=422, detail="Could not extract job description content.")
 
+    cache_key = _result_key(file_bytes, combined_jd)
+    cached = RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return {"cache_key": cache_key, "cached": cached}
+
     # --- Extract resume sections ---
+    # CPU-bound parsing runs in the process pool so the event loop stays responsive;
+    # without a pool (e.g. lifespan not run) it runs in a thread under the shared
+    # MuPDF lock, since PyMuPDF can't be used from several threads at once
+    parser_pool = getattr(request.app.state, "parser_pool", None)
     try:
-        if ext == "docx":
-            sections = extract_docx_sections(file_bytes)
-            full_text = get_full_docx_text(file_bytes)
+        if parser_pool is not None:
+            sections, full_text = await asyncio.get_running_loop().run_in_executor(
+                parser_pool, parse_resume, ext, file_bytes
+            )
         else:
-            doc = fitz.open(stream=file_bytes, filetype="pdf")
-            sections = find_resume_sections(doc)
-            doc.close()
-            full_text = get_full_pdf_text(file_bytes)
+            sections, full_text = await run_mupdf_in_thread(parse_resume, ext, file_bytes)
     except Exception as e:
-        print(f"[ERROR] Parsing failed: {traceback.format_exc()}")
+        logger.exception("Resume parsing failed")
         raise HTTPException(status_code=500, detail=f"Resume parsing failed: {str(e)}")
 
-    # --- Analysis via Groq ---
-    try:
-         print(f"[DEBUG] Sending {len(sections.get('experience', []))} experience blocks to LLM...")
-         analysis = rewrite_sections(sections, combined_jd)
-    except Exception as e:
-        print(f"[ERROR] Analysis failed: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sending %d experience blocks to LLM", len(sections.get("experience", [])))
 
-    # --- ATS Scoring ---
-    try:
-        score = score_resume(full_text, combined_jd)
-    except Exception as e:
-        # Fallback
-        kw = calculate_keyword_overlap(full_text, combined_jd)
-        score = {
-            "total": kw["quick_score"],
-            "keyword_match": int(kw["match_rate"] * 40),
-            "role_relevancy": 0,
-            "formatting_simplicity": 20,
-            "feedback": "Deep scoring failed. Basic keyword score used.",
-            "top_matched_keywords": kw["matched"][:5],
-            "missing_keywords": kw["missing"][:5],
-        }
-
-    return JSONResponse({
-        "job_title": jd_data.get("title", "Unknown"),
+    return {
+        "cache_key": cache_key,
+        "cached": None,
+        "jd_data": jd_data,
+        "combined_jd": combined_jd,
+        "sections": sections,
+        "full_text": full_text,
+    }
+
+
+def _keyword_score(full_text: str, combined_jd: str) -> dict:
+    """Keyword-overlap score used when LLM scoring fails."""
+    kw = calculate_keyword_overlap(full_text, combined_jd)
+    return {
+        "total": kw["quick_score"],
+        "keyword_match": int(kw["match_rate"] * 40),
+        "role_relevancy": 0,
+        "formatting_simplicity": 20,
+        "feedback": "Deep scoring failed. Basic keyword score used.",
+        "top_matched_keywords": kw["matched"][:5],
+        "missing_keywords": kw["missing"][:5],
+    }
+
+
+def _finish(ctx: dict, analysis: dict, score: Optional[dict]) -> dict:
+    """Builds the response payload, falling back to the keyword score if the LLM gave none."""
+    llm_scored = score is not None
+    if not llm_scored:
+        logger.warning("Deep scoring missing from LLM response, using keyword score")
+        score = _keyword_score(ctx["full_text"], ctx["combined_jd"])
+
+    sections = ctx["sections"]
+    result = {
+        "job_title": ctx["jd_data"].get("title", "Unknown"),
         "ats_score": score,
         "analysis": analysis,
         "sections_found": {
             "summary_blocks": len(sections.get("summary", [])),
             "experience_blocks": len(sections.get("experience", [])),
         },
-    })
+    }
+    # Don't pin the keyword fallback; a retry should get a real LLM score
+    if llm_scored:
+        RESULT_CACHE[ctx["cache_key"]] = result
+    return result
+
+
+def _sse(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.post("/optimize")
+async def optimize_resume(
+    request: Request,
+    file: UploadFile = File(...),
+    jd_url: Optional[str] = Form(None),
+    jd_text: Optional[str] = Form(None),
+):
+    """
+    Pipeline:
+    1. Read resume
+    2. Get JD
+    3. Extract sections
+    4. Generate suggestions via Groq
+    5. Score resume
+    6. Return analysis JSON
+    """
+    ctx = await _prepare(request, file, jd_url, jd_text)
+    if ctx["cached"] is not None:
+        return ORJSONResponse(ctx["cached"])
+
+    # --- Analysis + ATS Scoring in one Groq call ---
+    try:
+        analysis, score = await analyze_resume(ctx["sections"], ctx["full_text"], ctx["combined_jd"])
+    except Exception as e:
+        logger.exception("Analysis failed")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+    return ORJSONResponse(_finish(ctx, analysis, score))
+
+
+@router.post("/optimize/stream")
+async def optimize_resume_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    jd_url: Optional[str] = Form(None),
+    jd_text: Optional[str] = Form(None),
+):
+    """
+    Same pipeline as /optimize, streamed as server-sent events:
+    - `suggestion`: one experience suggestion, as soon as the model finishes it
+    - `result`: the full /optimize payload
+    - `error`: {"detail": str} if analysis fails mid-stream
+    """
+    ctx = await _prepare(request, file, jd_url, jd_text)
+
+    async def events():
+        if ctx["cached"] is not None:
+            yield _sse("result", ctx["cached"])
+            return
+
+        try:
+            async for event, data in stream_analyze_resume(ctx["sections"], ctx["full_text"], ctx["combined_jd"]):
+                if event == "result":
+                    analysis, score = data
+                else:
+                    yield _sse(event, data)
+        except Exception as e:
+            logger.exception("Analysis failed")
+            yield _sse("error", {"detail": f"Analysis failed: {str(e)}"})
+            return
+
+        yield _sse("result", _finish(ctx, analysis, score))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
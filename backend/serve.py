@@ -0,0 +1,31 @@
+"""
+Production launcher: `python backend/serve.py`.
+Kept separate from main.py because parser pool workers re-import the
+launching script; this one imports nothing until it runs, so workers
+never load the FastAPI app.
+"""
+
+import os
+
+
+def run(app="main:app"):
+    import uvicorn
+    port = int(os.getenv("PORT", 8000))
+    # Only trust X-Forwarded-* headers when explicitly deployed behind a load balancer
+    proxy_headers = os.getenv("PROXY_HEADERS", "false").lower() in ("1", "true", "yes")
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        proxy_headers=proxy_headers,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "*") if proxy_headers else None,
+        server_header=False,
+        date_header=False,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -9,26 +9,61 @@ from collections import Counter
 from typing import Optional
 
 
+_STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "from", "is", "are", "was", "were", "be", "been",
+    "have", "has", "had", "do", "does", "did", "will", "would", "could",
+    "should", "may", "might", "shall", "can", "not", "that", "this",
+    "these", "those", "as", "it", "its", "we", "you", "your", "our",
+    "their", "they", "he", "she", "i", "me", "us", "him", "her",
+    "which", "who", "what", "when", "where", "how", "if", "then",
+    "than", "so", "also", "all", "any", "each", "more", "most", "other"
+})
+
+_TOKEN_RE = re.compile(r'\b[a-zA-Z][a-zA-Z\+#\.\-]{2,}\b')
+# Bullet or numbered list item: where a JD states its requirements
+_BULLET_RE = re.compile(r'^(?:[-*\u2022\u00b7\u25aa\u2013]|\d+[.)])\s*')
+
+
+def _top_keywords_and_vocab(text: str, top_n: int, need_counter: bool = True) -> tuple[list[str], set[str]]:
+    """
+    Returns (top_n most frequent keywords, full keyword vocabulary).
+    When need_counter is False, no ranking is done and the top list is empty.
+
+    Tokens are counted in C (findall + Counter) and stopwords are removed
+    afterwards with one set operation, instead of a per-token Python filter.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not need_counter:
+        return [], set(tokens) - _STOPWORDS
+    counts = Counter(tokens)
+    for w in _STOPWORDS.intersection(counts):
+        del counts[w]
+    return [word for word, _ in counts.most_common(top_n)], set(counts)
+
+
 def extract_keywords(text: str, top_n: int = 50) -> list[str]:
     """
     Extracts significant keywords from text using simple frequency analysis.
     Filters out stopwords.
     """
-    STOPWORDS = {
-        "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
-        "of", "with", "by", "from", "is", "are", "was", "were", "be", "been",
-        "have", "has", "had", "do", "does", "did", "will", "would", "could",
-        "should", "may", "might", "shall", "can", "not", "that", "this",
-        "these", "those", "as", "it", "its", "we", "you", "your", "our",
-        "their", "they", "he", "she", "i", "me", "us", "him", "her",
-        "which", "who", "what", "when", "where", "how", "if", "then",
-        "than", "so", "also", "all", "any", "each", "more", "most", "other"
-    }
+    return _top_keywords_and_vocab(text, top_n)[0]
 
-    words = re.findall(r'\b[a-zA-Z][a-zA-Z\+#\.\-]{2,}\b', text.lower())
-    filtered = [w for w in words if w not in STOPWORDS]
-    counts = Counter(filtered)
-    return [word for word, _ in counts.most_common(top_n)]
+
+def keyword_lines(text: str, top_n: int = 30) -> list[str]:
+    """
+    Returns the non-empty lines of text (whitespace-collapsed), dropping
+    only boilerplate: prose lines that mention none of its top_n keywords.
+    Bullet and numbered lines are always kept, since that is where a JD
+    lists its requirements, even a skill it names only once.
+    """
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    keywords = set(extract_keywords(text, top_n))
+    return [
+        line for line in lines
+        if _BULLET_RE.match(line) or keywords.intersection(_TOKEN_RE.findall(line.lower()))
+    ]
 
 
 def calculate_keyword_overlap(resume_text: str, jd_text: str) -> dict:
@@ -44,8 +79,9 @@ def calculate_keyword_overlap(resume_text: str, jd_text: str) -> dict:
             "quick_score": int (0-100)
         }
     """
-    jd_keywords = set(extract_keywords(jd_text, top_n=40))
-    resume_words = set(extract_keywords(resume_text, top_n=200))
+    jd_top, _ = _top_keywords_and_vocab(jd_text, 40, need_counter=True)
+    _, resume_words = _top_keywords_and_vocab(resume_text, 0, need_counter=False)
+    jd_keywords = set(jd_top)
 
     matched = list(jd_keywords & resume_words)
     missing = list(jd_keywords - resume_words)
@@ -8,37 +8,59 @@ import io
 from docx import Document
 
 # Keywords for section detection
-SUMMARY_KEYWORDS = {"summary", "professional summary", "profile", "objective", "about me", "overview", "executive summary"}
-EXPERIENCE_KEYWORDS = {"experience", "work experience", "professional experience", "employment", "career", "work history", "employment history"}
-STOP_KEYWORDS = {"education", "skills", "certifications", "projects", "awards", "languages", "references", "volunteer", "organizations", "links"}
+SUMMARY_KEYWORDS = frozenset({"summary", "professional summary", "profile", "objective", "about me", "overview", "executive summary"})
+EXPERIENCE_KEYWORDS = frozenset({"experience", "work experience", "professional experience", "employment", "career", "work history", "employment history"})
+STOP_KEYWORDS = frozenset({"education", "skills", "certifications", "projects", "awards", "languages", "references", "volunteer", "organizations", "links"})
 
-def _is_heading(para) -> bool:
-    if para.style and para.style.name and "heading" in para.style.name.lower():
+def _open_docx(data):
+    """Opens a Document from raw bytes, a file path, or a file-like object."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return Document(io.BytesIO(data))
+    return Document(data)
+
+_ALL_HEADING_KEYWORDS = SUMMARY_KEYWORDS | EXPERIENCE_KEYWORDS | STOP_KEYWORDS
+
+def _is_heading(para, text: str) -> bool:
+    """`text` is the paragraph's already-stripped text, so it isn't rebuilt from runs."""
+    style = para.style
+    style_name = style.name if style is not None else None
+    if style_name and "heading" in style_name.lower():
         return True
-    text = para.text.strip()
     if not text:
         return False
-    if all(run.bold for run in para.runs if run.text.strip()):
-        return True
-    return False
+    # Bold-only paragraph; stop at the first non-bold run with text
+    any_bold = False
+    for run in para.runs:
+        t = run.text
+        if not t or t.isspace():
+            continue
+        if not run.bold:
+            return False
+        any_bold = True
+    return any_bold
 
-def extract_docx_sections(file_path_or_bytes) -> dict:
-    if isinstance(file_path_or_bytes, (str, bytes)):
-        doc = Document(io.BytesIO(file_path_or_bytes) if isinstance(file_path_or_bytes, bytes) else file_path_or_bytes)
-    else:
-        doc = Document(io.BytesIO(file_path_or_bytes))
+def extract_docx_sections(file_path_or_bytes, return_doc: bool = False):
+    """
+    Returns the summary/experience sections of a DOCX resume.
+    With return_doc=True, returns (sections, doc) so callers can reuse the
+    parsed Document instead of opening the file a second time.
+    """
+    doc = _open_docx(file_path_or_bytes)
 
     sections = {"summary": [], "experience": [], "all_text": ""}
     all_text_parts = []
     current_section = None
 
-    for para_idx, para in enumerate(doc.paragraphs):
+    append = all_text_parts.append
+
+    for para in doc.paragraphs:
         text = para.text.strip()
-        all_text_parts.append(text)
+        append(text)
         if not text: continue
 
         text_lower = text.lower()
-        if _is_heading(para) or (len(text) < 60 and text_lower in (SUMMARY_KEYWORDS | EXPERIENCE_KEYWORDS | STOP_KEYWORDS)):
+        # Cheap keyword probe first; only inspect style/runs when it misses
+        if (len(text) < 60 and text_lower in _ALL_HEADING_KEYWORDS) or _is_heading(para, text):
             if text_lower in SUMMARY_KEYWORDS: current_section = "summary"
             elif text_lower in EXPERIENCE_KEYWORDS: current_section = "experience"
             elif text_lower in STOP_KEYWORDS: current_section = None
@@ -48,11 +70,13 @@ def extract_docx_sections(file_path_or_bytes) -> dict:
             sections[current_section].append({"text": text})
 
     sections["all_text"] = "\n".join(all_text_parts)
+    if return_doc:
+        return sections, doc
     return sections
 
 def get_full_docx_text(file_path_or_bytes) -> str:
-    if isinstance(file_path_or_bytes, bytes):
-        doc = Document(io.BytesIO(file_path_or_bytes))
-    else:
-        doc = Document(file_path_or_bytes)
+    return get_docx_text(_open_docx(file_path_or_bytes))
+
+def get_docx_text(doc) -> str:
+    """Returns all non-empty paragraph text from an already-open Document."""
     return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
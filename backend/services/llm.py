@@ -1,172 +1,422 @@
 """
-Groq LLM Integration (llama-3.3-70b-versatile)
+Groq LLM Integration (llama-3.3-70b-versatile, llama-3.1-8b-instant for scoring)
 - Generates ATS match scores
 - Provides suggestions for improvement
 """
 
 import json
+import logging
 import os
-import re
-from typing import Optional
-from groq import Groq
+from typing import AsyncIterator, Optional
+import httpx
+import orjson
 from dotenv import load_dotenv
 
+from services.ats_scorer import keyword_lines
+from services.llm_cache import LLMCache
+
 load_dotenv()
 
-_client: Optional[Groq] = None
+logger = logging.getLogger(__name__)
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+# The cache holds resume text, so it stays in memory unless LLM_CACHE_PATH
+# names a file to persist it to; LLM_CACHE_TTL bounds how long results live
+_cache = LLMCache(
+    os.getenv("LLM_CACHE_PATH") or None,
+    ttl=float(os.getenv("LLM_CACHE_TTL", 86400)),
+)
+
+_client: Optional[httpx.AsyncClient] = None
 
-def get_client() -> Groq:
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared Groq HTTP client. A single pooled client keeps
+    keep-alive connections open across requests.
+    """
     global _client
     if _client is None:
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("GROQ_API_KEY not set in environment / .env file")
-        _client = Groq(api_key=api_key)
+        _client = httpx.AsyncClient(
+            base_url=GROQ_BASE_URL,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            http2=True,
+        )
     return _client
 
-REWRITE_SYSTEM_PROMPT = """You are an elite ATS Optimization Architect and Expert Resume Strategist.
-Your goal is to transform a standard resume into a high-performance, ATS-dominant document that guarantees a 95+ match score.
-
-STRICT AGGRESSIVE RULES — NEVER VIOLATE:
-1. TOTAL SURGICAL SWEEP: You must evaluate and aggressively optimize EVERY experience block across the ENTIRE resume provided. No section or page is to be ignored.
-2. STRICT EXPERIENCE FOCUS: Focus EXCLUSIVELY on "experience_suggestions". Do NOT provide summary optimizations.
-3. ATS KEYWORD SATURATION: Suture the most critical technical and soft skills from the JD directly into the experience bullet points. Do not just "add" them; weave them into high-impact value statements.
-4. QUANTITATIVE DOMINANCE (KPIs): Force the inclusion of measurable results (e.g., "Increased X by 25%", "Reduced latency by 400ms", "Managed $2M budget"). If numbers aren't present in the original, infer high-impact context where possible without fabricating employers.
-5. AGGRESSIVE REPHRASING: Replace passive language with powerful action verbs. Ensure every bullet point starts with a strong verb and follows the Google XYZ formula: "Accomplished [X] as measured by [Y], by doing [Z]".
-6. COMPARATIVE OUTPUT: For each chunk, provide the "original" text and the "suggested" high-performance version.
-7. ANTI-HALLUCINATION: Stay within the bounds of the user's actual career history (Companies/Dates/Titles).
-8. OUTPUT FORMAT: Return ONLY valid JSON. 
-   {
-     "existing_skills": ["Skill A", "Skill B"],
-     "missing_skills": ["Skill X", "Skill Y"],
-     "experience_suggestions": [{"original": "...", "suggested": "..."}]
-   }"""
-
-SCORING_SYSTEM_PROMPT = """You are an ATS (Applicant Tracking System) expert evaluator and optimization strategist.
-Your goal is to provide a realistic current score but a HIGHLY AGGRESSIVE prospective score.
-Assume that if the user incorporates all suggested surgical rewrites and keywords, they will achieve near-perfect alignment (95-100).
-Return ONLY valid JSON, no explanation or markdown."""
-
-def rewrite_sections(resume_sections: dict, jd_text: str) -> dict:
-    """
-    Uses Groq to generate display suggestions for Summary and Experience sections.
+async def prewarm_client() -> None:
     """
+    Opens the pooled connection (DNS, TLS, HTTP/2) ahead of the first user
+    request with a cheap authenticated GET that costs no tokens.
+    """
+    response = await get_client().get("/models")
+    response.raise_for_status()
+
+async def _post_completion(payload: dict) -> str:
+    """Posts an OpenAI-compatible chat completion to Groq and returns the message text."""
     client = get_client()
+    response = await client.post("/chat/completions", content=orjson.dumps(payload))
+    if response.status_code == 400 and "response_format" in payload and _json_validate_failed(response):
+        # JSON mode rejects output that doesn't parse; plain mode returns it for _parse_json to salvage
+        logger.warning("Groq JSON mode rejected the generation; retrying without response_format")
+        return await _post_completion(_plain_mode(payload))
+    response.raise_for_status()
+    choice = orjson.loads(response.content)["choices"][0]
+    if choice.get("finish_reason") == "length":
+        # The JSON was cut off mid-document; retry once with the full budget
+        if payload.get("max_tokens", MAX_COMPLETION_TOKENS) < MAX_COMPLETION_TOKENS:
+            logger.warning("Completion hit max_tokens=%s; retrying with %s", payload["max_tokens"], MAX_COMPLETION_TOKENS)
+            return await _post_completion({**payload, "max_tokens": MAX_COMPLETION_TOKENS})
+        logger.warning("Completion truncated at max_tokens=%s", MAX_COMPLETION_TOKENS)
+    return choice["message"]["content"]
 
-    summary_texts = [e["text"] for e in resume_sections.get("summary", [])]
-    experience_texts = [e["text"] for e in resume_sections.get("experience", [])]
+def _json_validate_failed(response: httpx.Response) -> bool:
+    try:
+        return orjson.loads(response.content)["error"]["code"] == "json_validate_failed"
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        return False
 
-    if not summary_texts and not experience_texts:
-        return {"missing_skills": [], "summary_suggestions": [], "experience_suggestions": []}
+async def close_client() -> None:
+    global _client
+    await _cache.flush()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
-    user_prompt = f"""
-ACTION: PERFORM AGGRESSIVE SURGICAL OPTIMIZATION
+# Rewriting is generative and needs the large model; scoring is a
+# classification-style task the small, much faster model handles well
+REWRITE_MODEL = "llama-3.3-70b-versatile"
+SCORING_MODEL = "llama-3.1-8b-instant"
 
-I am providing you with the full content of a resume experience section and a target job description.
+# Prompts are kept terse: prefill time grows with prompt length, so every
+# rule is stated once (rules in the system prompt, output shape in the user prompt)
+SCORING_SYSTEM_PROMPT = """ATS evaluator. Rules:
+- Current score: honest and critical.
+- Prospective score: 95-100, assuming all suggested rewrites and keywords are applied.
+Return ONLY valid JSON."""
 
---- TARGET JOB DESCRIPTION ---
-{jd_text[:4000]}
+SCORING_PROMPT_HEAD = "RESUME:\n"
 
---- RESUME EXPERIENCE SECTIONS ---
-{json.dumps(experience_texts, indent=2)}
+SCORE_SHAPE = (
+    '{"keyword_match": <0-40>, "role_relevancy": <0-40>, "formatting_simplicity": <0-20>, '
+    '"total": <sum, 0-100>, "prospective_score": <95-100>, "feedback": "<2-3 sentences>", '
+    '"top_matched_keywords": ["..."], "missing_keywords": ["..."]}'
+)
 
-TASK REQUIREMENTS:
-1. Audit the experience blocks against the JD. Identify every single opportunity where technical keywords can be injected.
-2. Rewrite each block using the "Google XYZ" formula or high-impact "Situation-Task-Action-Result" (STAR) method.
-3. Ensure every suggestion is a MAJOR upgrade over the original in terms of ATS readability and keyword density.
-4. Identify the top 'existing_skills' and the critical 'missing_skills' required for the candidate to be a top-tier match.
+SCORING_PROMPT_TAIL = "\nReturn JSON:\n" + SCORE_SHAPE
 
-Return ONLY the completed JSON analysis.
-"""
+# Fused rewrite + scoring prompt: one round-trip sends the JD once and
+# returns both the analysis and the score
+ANALYZE_SYSTEM_PROMPT = """ATS resume optimizer and evaluator. Rules:
+- Score the resume: current score honest and critical; prospective 95-100 assuming all rewrites are applied.
+- Rewrite EVERY experience block; no summary rewrites.
+- Weave the JD's key skills into each bullet; strong verb first, Google XYZ formula.
+- Add measurable results; never invent employers, titles or dates.
+Return ONLY valid JSON."""
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": REWRITE_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.3,
-        max_tokens=4096,
-    )
+ANALYZE_PROMPT_HEAD = "JD:\n"
+
+ANALYZE_PROMPT_TAIL = (
+    '\nReturn JSON:\n{"score": ' + SCORE_SHAPE + ', "existing_skills": ["..."], "missing_skills": ["..."], '
+    '"experience_suggestions": [{"original": "...", "suggested": "..."}]}'
+)
+
+# Bounds on what a single resume can contribute to a prompt
+MAX_BLOCK_CHARS = 500
+MAX_BLOCKS = 30
+MAX_RESUME_CHARS = 1500
 
-    raw = response.choices[0].message.content.strip()
-    raw = re.sub(r"^```(?:json)?\s*", "", raw)
-    raw = re.sub(r"\s*```$", "", raw)
+# Output budgets sized to the JSON each call returns. A score object is
+# ~200 tokens; rewrites echo each block plus a longer suggestion with JSON
+# escaping, so they scale with the input (~3 chars per token, tripled, plus
+# room for the skill lists), never below REWRITE_MIN_TOKENS.
+SCORE_MAX_TOKENS = 350
+REWRITE_MIN_TOKENS = 1024
+MAX_COMPLETION_TOKENS = 4096
+# Groq's JSON mode guarantees a bare JSON object, but rejects stop
+# sequences and streaming, so those requests fall back to plain mode
+JSON_MODE = {"type": "json_object"}
+# Plain mode only: halts generation if the model closes a markdown fence after the JSON
+STOP_SEQUENCES = ["\n```"]
 
+def _plain_mode(payload: dict) -> dict:
+    """The same request without JSON mode, for streaming or after a JSON-mode rejection."""
+    plain = {k: v for k, v in payload.items() if k != "response_format"}
+    plain["stop"] = STOP_SEQUENCES
+    return plain
+
+def _rewrite_max_tokens(blocks: list[str], extra: int = 0) -> int:
+    budget = max(sum(len(t) // 3 for t in blocks) * 3 + 300, REWRITE_MIN_TOKENS)
+    return min(budget + extra, MAX_COMPLETION_TOKENS)
+
+def _truncate(text: str, max_bytes: int) -> str:
+    """
+    Cuts text to at most max_bytes of UTF-8, dropping any partial
+    trailing character. Bounds what is actually sent over the wire.
+    """
+    if len(text) * 4 <= max_bytes:
+        return text  # can't exceed the budget even if every char is 4 bytes
+    return memoryview(text.encode("utf-8"))[:max_bytes].tobytes().decode("utf-8", errors="ignore")
+
+def _compact_resume(text: str) -> str:
+    """Collapses whitespace runs, then caps the resume at MAX_RESUME_CHARS."""
+    return " ".join(text.split())[:MAX_RESUME_CHARS]
+
+def _trim_jd(jd_text: str, max_bytes: int) -> str:
+    """
+    Fits the JD into max_bytes. Only a JD over budget is trimmed: boilerplate
+    prose goes first (requirements and skill lines are kept), then the tail.
+    """
+    if len(jd_text) * 4 <= max_bytes or len(jd_text.encode("utf-8")) <= max_bytes:
+        return jd_text
+    return _truncate("\n".join(keyword_lines(jd_text)) or jd_text, max_bytes)
+
+def _cap_blocks(texts: list[str]) -> list[str]:
+    """Caps both the number of resume blocks and the length of each one."""
+    return [t[:MAX_BLOCK_CHARS] for t in texts[:MAX_BLOCKS]]
+
+def _parse_json(raw: str) -> Optional[dict]:
+    """
+    Parses the model's JSON output; None if it is not a valid object.
+    Plain-mode output may wrap the object in a markdown fence or prose, so
+    on failure the outermost {...} is tried as well.
+    """
     try:
-        result = json.loads(raw)
-    except json.JSONDecodeError:
-        match = re.search(r'\{[\s\S]*\}', raw)
-        if match:
-            result = json.loads(match.group())
-        else:
-            result = {"missing_skills": [], "experience_suggestions": []}
+        result = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        start, end = raw.find("{"), raw.rfind("}")
+        if start < 0 or end < start:
+            return None
+        try:
+            result = orjson.loads(raw[start:end + 1])
+        except orjson.JSONDecodeError:
+            return None
+    return result if isinstance(result, dict) else None
 
+def _parse_rewrite(raw: str) -> dict:
+    result = _parse_json(raw)
+    if result is None:
+        result = {"missing_skills": [], "experience_suggestions": []}
     return result
 
-def score_resume(resume_text: str, jd_text: str) -> dict:
+async def _stream_completion(payload: dict) -> AsyncIterator[str]:
     """
-    Scores a resume against the JD using Groq.
+    Streams a chat completion from Groq (server-sent events), yielding
+    content deltas as they arrive.
     """
     client = get_client()
+    # Groq's JSON mode can't be combined with streaming
+    body = orjson.dumps({**_plain_mode(payload), "stream": True})
+    async with client.stream("POST", "/chat/completions", content=body) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            choice = orjson.loads(data)["choices"][0]
+            if choice.get("finish_reason") == "length":
+                logger.warning("Streamed completion hit max_tokens=%s", payload.get("max_tokens"))
+            delta = choice.get("delta", {}).get("content")
+            if delta:
+                yield delta
 
-    user_prompt = f"""
-Score this resume against the job description below.
-
---- RESUME TEXT ---
-{resume_text[:3000]}
-
---- JOB DESCRIPTION ---
-{jd_text[:2000]}
-
-SCORING LOGIC:
-1. Current Score: Be honest and critical about the existing resume. 
-2. Prospective Score: Be AGGRESSIVE. If the user follows our expert optimization strategy (weaving in all missing hard skills and fixing impact statements), estimate a score in the 95-100 range. This represents the 'Unlocked Potential' of the profile.
-
-Return ONLY a JSON object with this exact structure:
-{{
-  "keyword_match": <integer 0-40>,
-  "role_relevancy": <integer 0-40>,
-  "formatting_simplicity": <integer 0-20>,
-  "total": <sum of above three, 0-100>,
-  "prospective_score": <aggressive estimate 95-100 assuming optimizations are applied>,
-  "feedback": "<2-3 sentence summary of strengths and areas to improve>",
-  "top_matched_keywords": ["keyword1", "keyword2", "keyword3"],
-  "missing_keywords": ["keyword1", "keyword2", "keyword3"]
-}}
-"""
+class _ArrayItemScanner:
+    """
+    Pulls completed items out of a `"<key>": [ ... ]` array in JSON text
+    that arrives in pieces, so each item can be forwarded as soon as its
+    closing brace is streamed rather than after the whole document.
+    """
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, key: str):
+        self._marker = f'"{key}"'
+        self._buf = ""
+        self._pos: Optional[int] = None  # next unread index inside the array
+        self._done = False
+
+    def feed(self, text: str) -> list:
+        self._buf += text
+        items = []
+        if self._done:
+            return items
+        buf = self._buf
+        if self._pos is None:
+            i = buf.find(self._marker)
+            j = buf.find("[", i + len(self._marker)) if i >= 0 else -1
+            if j < 0:
+                return items
+            self._pos = j + 1
+
+        pos = self._pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                self._done = True
+                break
+            try:
+                item, pos = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # item still incomplete; wait for more text
+            items.append(item)
+        self._pos = pos
+        return items
+
+def _analyze_payload(resume_sections: dict, resume_text: str, jd_text: str) -> dict:
+    experience_texts = [e["text"] for e in resume_sections.get("experience", [])]
+    blocks = _cap_blocks(experience_texts)
+
+    user_prompt = "".join([
+        ANALYZE_PROMPT_HEAD,
+        _trim_jd(jd_text, 4000),
+        "\nRESUME:\n",
+        _compact_resume(resume_text),
+        "\nEXPERIENCE BLOCKS:\n",
+        orjson.dumps(blocks).decode(),
+        ANALYZE_PROMPT_TAIL,
+    ])
+
+    return {
+        "model": REWRITE_MODEL,
+        "messages": [
+            {"role": "system", "content": ANALYZE_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": 0.3,
+        "max_tokens": _rewrite_max_tokens(blocks, extra=SCORE_MAX_TOKENS),
+        "response_format": JSON_MODE,
+    }
+
+def _split_analysis(result: dict) -> tuple[dict, Optional[dict]]:
+    """Separates the fused response into (analysis, score); score is None if missing or malformed."""
+    score = result.pop("score", None)
+    if not isinstance(score, dict):
+        return result, None
+    try:
+        return result, _normalize_score(score)
+    except (TypeError, ValueError):
+        return result, None
+
+async def analyze_resume(resume_sections: dict, resume_text: str, jd_text: str) -> tuple[dict, Optional[dict]]:
+    """
+    Generates experience suggestions and the ATS score in a single Groq call.
+    Returns (analysis, score); score is None if the model omitted it, so the
+    caller can fall back.
+    """
+    if not resume_sections.get("experience"):
+        return await _score_only(resume_text, jd_text)
+
+    payload = _analyze_payload(resume_sections, resume_text, jd_text)
+    key = _cache.key(payload)
+    hit = _cache.get(key)
+    if hit is not None:
+        return _split_analysis(hit)
+
+    analysis, score = _split_analysis(_parse_rewrite(await _post_completion(payload)))
+    _remember_analysis(key, analysis, score)
+    return analysis, score
+
+def _remember_analysis(key: str, analysis: dict, score: Optional[dict]) -> None:
+    # Only complete responses are cached, so a retry can still recover a missing score
+    if score is not None:
+        _cache.put(key, {**analysis, "score": score})
+
+async def stream_analyze_resume(resume_sections: dict, resume_text: str, jd_text: str) -> AsyncIterator[tuple[str, object]]:
+    """
+    Streaming variant of analyze_resume. Yields ("suggestion", item) for
+    each experience suggestion as it finalizes, then ("result", (analysis, score)).
+    """
+    if not resume_sections.get("experience"):
+        yield "result", await _score_only(resume_text, jd_text)
+        return
+
+    payload = _analyze_payload(resume_sections, resume_text, jd_text)
+    key = _cache.key(payload)
+    hit = _cache.get(key)
+    if hit is not None:
+        for item in hit.get("experience_suggestions", []):
+            yield "suggestion", item
+        yield "result", _split_analysis(hit)
+        return
+
+    scanner = _ArrayItemScanner("experience_suggestions")
+    parts = []
+    async for delta in _stream_completion(payload):
+        parts.append(delta)
+        for item in scanner.feed(delta):
+            yield "suggestion", item
+    analysis, score = _split_analysis(_parse_rewrite("".join(parts)))
+    _remember_analysis(key, analysis, score)
+    yield "result", (analysis, score)
+
+async def score_resume(resume_text: str, jd_text: str) -> Optional[dict]:
+    """
+    Scores a resume against the JD using Groq's small model.
+    Returns None if the model's output is not a usable score.
+    """
+    user_prompt = "".join([
+        SCORING_PROMPT_HEAD,
+        _compact_resume(resume_text),
+        "\nJD:\n",
+        _trim_jd(jd_text, 2000),
+        SCORING_PROMPT_TAIL,
+    ])
+
+    payload = {
+        "model": SCORING_MODEL,
+        "messages": [
             {"role": "system", "content": SCORING_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
-        temperature=0.2,
-        max_tokens=1024,
-    )
+        "temperature": 0.2,
+        "max_tokens": SCORE_MAX_TOKENS,
+        "response_format": JSON_MODE,
+    }
+    key = _cache.key(payload)
+    hit = _cache.get(key)
+    if hit is not None:
+        return hit
 
-    raw = response.choices[0].message.content.strip()
-    raw = re.sub(r"^```(?:json)?\s*", "", raw)
-    raw = re.sub(r"\s*```$", "", raw)
+    result = _parse_json(await _post_completion(payload))
+    if result is None:
+        return None
+    try:
+        result = _normalize_score(result)
+    except (TypeError, ValueError):
+        return None
+    _cache.put(key, result)
+    return result
 
+async def _score_only(resume_text: str, jd_text: str) -> tuple[dict, Optional[dict]]:
+    """
+    Used when the resume has no experience blocks: with nothing to rewrite,
+    only the score is needed, so the fused 70B call is skipped. The skill
+    lists are filled in from the score's keywords. A failed call yields no
+    score, so the caller falls back to the keyword score as for bad output.
+    """
     try:
-        result = json.loads(raw)
-    except json.JSONDecodeError:
-        match = re.search(r'\{[\s\S]*\}', raw)
-        if match:
-            result = json.loads(match.group())
-        else:
-            result = {
-                "total": 0,
-                "keyword_match": 0,
-                "role_relevancy": 0,
-                "formatting_simplicity": 0,
-                "feedback": "Scoring failed.",
-                "top_matched_keywords": [],
-                "missing_keywords": [],
-            }
+        score = await score_resume(resume_text, jd_text)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Small-model scoring failed: %s", e)
+        score = None
+    analysis = {
+        "existing_skills": score.get("top_matched_keywords", []) if score else [],
+        "missing_skills": score.get("missing_keywords", []) if score else [],
+        "experience_suggestions": [],
+    }
+    return analysis, score
 
+def _normalize_score(result: dict) -> dict:
     result["total"] = min(100, max(0, int(result.get("total", 0))))
     result["prospective_score"] = min(100, max(0, int(result.get("prospective_score", result["total"]))))
     return result
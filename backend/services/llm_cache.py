@@ -0,0 +1,132 @@
+"""
+Cache for LLM results.
+Keyed on a SHA-256 of the exact chat request (model, prompts, inputs), so a
+re-upload of the same resume against the same JD skips Groq entirely, and
+any prompt or model change naturally misses.
+Entries expire after `ttl` seconds. Persisting to a JSON file is opt-in:
+the cache holds resume text, so it stays in memory unless a path is given.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    Dict of {request_hash: (expires_at, result)}, optionally backed by a JSON file.
+    Values are held as serialized JSON so every hit returns a fresh copy the
+    caller is free to mutate. Least recently used entries are evicted past
+    max_entries.
+    Writes to disk are debounced: a burst of puts inside an event loop
+    results in one save, `save_delay` seconds later, run in a worker thread.
+    """
+
+    def __init__(self, path: Optional[str], max_entries: int = 1000, ttl: float = 86400, save_delay: float = 5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.save_delay = save_delay
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, tuple[float, bytes]] = {}
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._write_lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(payload: dict) -> str:
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    def get(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= time.time():
+            self.misses += 1
+            return None
+        self._entries[key] = entry  # re-insert as most recently used
+        self.hits += 1
+        return orjson.loads(entry[1])
+
+    def put(self, key: str, value) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.time() + self.ttl, orjson.dumps(value))
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        if self.path:
+            self._schedule_save()
+
+    async def flush(self) -> None:
+        """Writes any pending changes now; call before the event loop shuts down."""
+        task = self._save_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self._wake.set()
+            await task
+        elif self._dirty:
+            self._dirty = False
+            await asyncio.to_thread(self._write, self._snapshot())
+
+    def _schedule_save(self) -> None:
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to defer to; a synchronous caller can afford the write
+            self._dirty = False
+            self._write(self._snapshot())
+            return
+        task = self._save_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._save_task = loop.create_task(self._save_soon())
+
+    async def _save_soon(self) -> None:
+        while self._dirty:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.save_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty = False
+            await asyncio.to_thread(self._write, self._snapshot())
+
+    def _snapshot(self) -> bytes:
+        now = time.time()
+        return b"{" + b",".join(
+            orjson.dumps(k) + b":[" + orjson.dumps(expires) + b"," + v + b"]"
+            for k, (expires, v) in self._entries.items()
+            if expires > now
+        ) + b"}"
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            logger.warning("Ignoring unreadable LLM cache at %s", self.path)
+            return
+        now = time.time()
+        for key, entry in data.items():
+            # Skips expired entries and any written in an older format
+            if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], (int, float)) and entry[0] > now:
+                self._entries[key] = (entry[0], orjson.dumps(entry[1]))
+
+    def _write(self, body: bytes) -> None:
+        tmp = self.path + ".tmp"
+        try:
+            with self._write_lock:
+                with open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, self.path)
+        except OSError:
+            logger.warning("Could not persist LLM cache to %s", self.path)
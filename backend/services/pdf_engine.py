@@ -9,141 +9,311 @@ Font matching note: Custom embedded fonts (e.g., Calibri.ttf) may not be availab
 in the PDF renderer. We default to Helvetica/Times as closest alternatives.
 """
 
+import asyncio
+import hashlib
 import io
 import re
+import threading
+from array import array
+from collections import defaultdict
+from functools import lru_cache
 import fitz  # PyMuPDF
 from typing import Optional
+from cachetools import LRUCache
 
 from utils.text_utils import enforce_length_constraint
 
 
 # Keywords that signal the start of target sections
-SUMMARY_KEYWORDS = {"summary", "professional summary", "profile", "objective", "about me", "overview", "executive summary"}
-EXPERIENCE_KEYWORDS = {"experience", "work experience", "professional experience", "employment", "career", "work history", "employment history"}
-STOP_KEYWORDS = {"education", "skills", "certifications", "projects", "awards", "references", "languages", "organizations", "links"}
+SUMMARY_KEYWORDS = frozenset({"summary", "professional summary", "profile", "objective", "about me", "overview", "executive summary"})
+EXPERIENCE_KEYWORDS = frozenset({"experience", "work experience", "professional experience", "employment", "career", "work history", "employment history"})
+STOP_KEYWORDS = frozenset({"education", "skills", "certifications", "projects", "awards", "references", "languages", "organizations", "links"})
+
+
+# Extraction results keyed by a BLAKE2b digest of the PDF bytes, so a
+# resume that is extracted again (scoring, then rewriting) isn't re-parsed
+_SECTIONS_CACHE = LRUCache(maxsize=16)
+_TEXT_CACHE = LRUCache(maxsize=16)
+
+
+def _read_pdf_bytes(file_path_or_bytes):
+    if isinstance(file_path_or_bytes, (bytes, bytearray)):
+        return file_path_or_bytes
+    with open(file_path_or_bytes, "rb") as f:
+        return f.read()
+
+
+def _digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _open_pdf(file_path_or_bytes) -> fitz.Document:
+    if isinstance(file_path_or_bytes, (bytes, bytearray)):
+        return fitz.open(stream=file_path_or_bytes, filetype="pdf")
+    return fitz.open(file_path_or_bytes)
+
+
+# Header trigger words, in priority order: when a line mentions several
+# sections, summary beats experience beats stop
+_SECTION_TRIGGERS = (
+    ("summary", ("summary", "profile", "objective", "about", "overview")),
+    ("experience", ("experience", "history", "employment", "work", "career")),
+    ("stop", ("education", "skills", "certs", "projects", "awards", "references", "languages", "links", "interests")),
+)
+# word -> (priority, section): one dict probe per word
+_SECTION_MAP = {
+    word: (rank, section)
+    for rank, (section, triggers) in enumerate(_SECTION_TRIGGERS)
+    for word in triggers
+}
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9 ]')
+# Byte table for the same substitution on ASCII text: bytes.translate does
+# it in one C pass, the regex is only kept for non-ASCII lines
+_KEEP = frozenset(b"abcdefghijklmnopqrstuvwxyz0123456789 ")
+_NON_ALNUM_TABLE = bytes(b if b in _KEEP else 0x20 for b in range(256))
 
 
 def _match_section(text: str) -> Optional[str]:
     """Smart section detection using regex and fuzzy matching."""
     t = text.strip().lower()
     # Remove symbols like " - ", " : ", etc.
-    t = re.sub(r'[^a-z0-9 ]', ' ', t).strip()
+    if t.isascii():
+        t = t.encode().translate(_NON_ALNUM_TABLE).decode().strip()
+    else:
+        t = _NON_ALNUM_RE.sub(' ', t).strip()
     
     if not t or len(t) > 50:
         return None
 
-    summary_triggers = {"summary", "profile", "objective", "about", "overview"}
-    experience_triggers = {"experience", "history", "employment", "work", "career"}
-    stop_triggers = {"education", "skills", "certs", "projects", "awards", "references", "languages", "links", "interests"}
-
-    # Use set intersection for word-level matching
-    words = set(t.split())
-    if words & summary_triggers: return "summary"
-    if words & experience_triggers: return "experience"
-    if words & stop_triggers: return "stop"
-    
-    return None
+    # Word-level matching
+    hits = [_SECTION_MAP[w] for w in t.split() if w in _SECTION_MAP]
+    return min(hits)[1] if hits else None
 
 
 def extract_pdf_sections(file_path_or_bytes) -> dict:
     """
     Extracts text blocks from Summary and Experience sections of a PDF resume.
 
-    Returns:
+    Each section is stored column-wise (one array per field, span i at
+    index i) rather than as one dict per span:
         {
-            "summary": [
-                {
-                    "page": int,
-                    "rect": [x0, y0, x1, y1],
-                    "text": str,
-                    "fontsize": float,
-                    "fontname": str,
-                    "color": int,
-                    "block_idx": int
-                }
-            ],
-            "experience": [...],
+            "summary": {
+                "page": array[int],
+                "rect": array[float],      # flat: x0, y0, x1, y1 per span
+                "origin": array[float],    # flat: x, y per span
+                "text": [str],
+                "fontsize": array[float],
+                "fontname": [str],
+                "color": array[int],
+                "block_idx": array[int]
+            },
+            "experience": {...},
             "all_text": str
         }
+
+    Results are cached by content hash and shared between callers; treat
+    them as read-only.
     """
-    if isinstance(file_path_or_bytes, bytes):
-        doc = fitz.open(stream=file_path_or_bytes, filetype="pdf")
-    else:
-        doc = fitz.open(file_path_or_bytes)
+    data = _read_pdf_bytes(file_path_or_bytes)
+    key = _digest(data)
+    sections = _SECTIONS_CACHE.get(key)
+    if sections is None:
+        with PdfResume(data) as resume:
+            sections = resume.sections
+        _SECTIONS_CACHE[key] = sections
+    return sections
+
 
-    sections = {"summary": [], "experience": [], "all_text": ""}
+def _span_columns() -> dict:
+    return {
+        "page": array("i"),
+        "rect": array("d"),
+        "origin": array("d"),
+        "text": [],
+        "fontsize": array("d"),
+        "fontname": [],
+        "color": array("I"),
+        "block_idx": array("i"),
+    }
+
+
+def _extract_from_doc(doc: fitz.Document) -> dict:
+    """Section extraction over an already-open document; see extract_pdf_sections."""
+    sections = {"summary": _span_columns(), "experience": _span_columns(), "all_text": ""}
     all_text_parts = []
+    append = all_text_parts.append
     current_section = None
+    seen_sections = set()
+    # Set once a stop header follows both target sections, and cleared if a
+    # target header appears again. The rest of the current page is still
+    # walked normally; only the pages after it are read as plain text,
+    # and they get the full span dict parse only if that text shows a
+    # target section starting again
+    done_with_targets = False
 
     print(f"[PDF Engine] Starting extraction for document...")
-    for page_num in range(len(doc)):
-        page = doc[page_num]
+    for page_num, page in enumerate(doc):
+        # Parse the content stream once; the plain-text check and the dict
+        # walk below both read from this TextPage
+        textpage = page.get_textpage(flags=fitz.TEXT_PRESERVE_WHITESPACE)
+        if done_with_targets:
+            page_text = page.get_text("text", textpage=textpage)
+            if not any(_match_section(line) in ("summary", "experience") for line in page_text.splitlines()):
+                append(page_text)
+                continue
+            done_with_targets = False
         # Use "dict" but focus on spans within lines to preserve granular formatting
-        blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
+        blocks = page.get_text("dict", textpage=textpage)["blocks"]
 
         for block_idx, block in enumerate(blocks):
-            if block.get("type") != 0: continue
+            if block["type"] != 0: continue
 
-            for line in block.get("lines", []):
+            # PyMuPDF's "dict" output always carries these keys on text
+            # blocks, so they are indexed directly instead of .get() probes
+            for line in block["lines"]:
+                spans = line["spans"]
                 # Join spans to check the line text for a header
-                line_text = "".join(s.get("text", "") for s in line.get("spans", [])).strip()
+                line_text = "".join(s["text"] for s in spans).strip()
                 match = _match_section(line_text)
                 
                 if match:
                     print(f"[PDF Engine] Detected section change: '{line_text}' -> {match}")
                     current_section = match if match != "stop" else None
+                    if current_section:
+                        seen_sections.add(current_section)
+                        done_with_targets = False
+                    elif len(seen_sections) == 2:
+                        done_with_targets = True
                     continue # Skip the header text itself
 
                 # Only collect spans if we are inside a target section
                 if current_section:
-                    for span in line.get("spans", []):
-                        text = span.get("text", "")
+                    cols = sections[current_section]
+                    for span in spans:
+                        text = span["text"]
                         if not text.strip(): continue
 
-                        rect = span["bbox"]
-                        sections[current_section].append({
-                            "page": page_num,
-                            "rect": list(rect),
-                            "text": text,
-                            "fontsize": span.get("size", 11.0),
-                            "fontname": span.get("font", "Helvetica"),
-                            "color": span.get("color", 0),
-                            "block_idx": block_idx,
-                            "origin": span.get("origin", (rect[0], rect[3]))
-                        })
-                        all_text_parts.append(text)
+                        cols["page"].append(page_num)
+                        cols["rect"].extend(span["bbox"])
+                        cols["origin"].extend(span["origin"])
+                        cols["text"].append(text)
+                        cols["fontsize"].append(span["size"])
+                        cols["fontname"].append(span["font"])
+                        cols["color"].append(span["color"])
+                        cols["block_idx"].append(block_idx)
+                        append(text)
                 else:
                     # Still collect all text for scoring
-                    for span in line.get("spans", []):
-                        all_text_parts.append(span.get("text", ""))
+                    for span in spans:
+                        append(span["text"])
 
-    doc.close()
     sections["all_text"] = "\n".join(all_text_parts)
-    print(f"[PDF Engine] Done. Found {len(sections['summary'])} summary spans and {len(sections['experience'])} experience spans.")
+    print(f"[PDF Engine] Done. Found {len(sections['summary']['text'])} summary spans and {len(sections['experience']['text'])} experience spans.")
     return sections
 
-    doc.close()
-    sections["all_text"] = "\n".join(all_text_parts)
-    return sections
+
+_BOLD_MARKERS = ("bold", "heavy", "black")
+_ITALIC_MARKERS = ("italic", "oblique")
+_SERIF_MARKERS = ("times", "serif", "georgia", "garamond")
 
 
+@lru_cache(maxsize=64)
 def _map_font(fontname: str) -> str:
     """
     Map PDF-embedded font names to PyMuPDF built-in fonts.
     Picks the closest available standard font.
     """
     name = fontname.lower()
-    if any(k in name for k in ["bold", "heavy", "black"]):
-        if any(k in name for k in ["italic", "oblique"]):
+    if any(k in name for k in _BOLD_MARKERS):
+        if any(k in name for k in _ITALIC_MARKERS):
             return "tibo"   # Times-BoldItalic
         return "helv"       # Helvetica (bold not directly available as separate name, use helv)
-    if any(k in name for k in ["italic", "oblique"]):
+    if any(k in name for k in _ITALIC_MARKERS):
         return "tiit"       # Times-Italic
-    if any(k in name for k in ["times", "serif", "georgia", "garamond"]):
+    if any(k in name for k in _SERIF_MARKERS):
         return "tiro"       # Times-Roman
     return "helv"           # Helvetica (default sans-serif)
 
 
+@lru_cache(maxsize=256)
+def _rgb(color: int) -> tuple[float, float, float]:
+    """Decodes a PyMuPDF 0xRRGGBB span color into a float tuple."""
+    return (((color >> 16) & 0xFF) / 255.0, ((color >> 8) & 0xFF) / 255.0, (color & 0xFF) / 255.0)
+
+
+class PdfResume:
+    """
+    One open PDF shared by extraction and injection, so a resume is parsed
+    once however many operations run on it. Use as a context manager, or
+    call close() when done.
+    """
+
+    def __init__(self, file_path_or_bytes):
+        self.doc = _open_pdf(file_path_or_bytes)
+        self._sections: Optional[dict] = None
+
+    @property
+    def sections(self) -> dict:
+        """Column-wise sections as described in extract_pdf_sections; extracted on first access."""
+        if self._sections is None:
+            self._sections = _extract_from_doc(self.doc)
+        return self._sections
+
+    def inject(self, rewrites: dict, tolerance: float = 0.05) -> bytes:
+        """
+        Redacts original text blocks and overlays new text, returning the
+        modified PDF bytes. Edits the open document, so call it once.
+        """
+        # Extract before redacting; span rects don't move when redactions
+        # are applied, so the same entries position the new text
+        sections = self.sections
+
+        # Bucket (columns, span index, new_text) by page so each page is visited once
+        by_page = defaultdict(list)
+        for section_name in ("summary", "experience"):
+            cols = sections[section_name]
+            pages = cols["page"]
+            for i, new_text in enumerate(rewrites.get(section_name, [])[:len(pages)]):
+                by_page[pages[i]].append((cols, i, new_text))
+
+        for page_num, items in by_page.items():
+            page = self.doc[page_num]
+            # Step 1: Redact (erase) the original text areas, then apply all of
+            # the page's redactions in one pass. Use white fill to blank the area cleanly
+            for cols, i, _ in items:
+                page.add_redact_annot(fitz.Rect(*cols["rect"][4 * i:4 * i + 4]), fill=(1, 1, 1))
+            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+
+            # Step 2: Insert the new text on the same, now redacted, page
+            for cols, i, new_text in items:
+                # Enforce ±5% length constraint
+                new_text = enforce_length_constraint(cols["text"][i], new_text, tolerance)
+
+                # Insert text at the exact origin of the original span to minimize jitter
+                page.insert_text(
+                    tuple(cols["origin"][2 * i:2 * i + 2]),
+                    new_text,
+                    fontname=_map_font(cols["fontname"][i]),
+                    fontsize=cols["fontsize"][i],
+                    color=_rgb(cols["color"][i]),
+                )
+
+        final_buf = io.BytesIO()
+        self.doc.save(final_buf)
+        print(f"[PDF] Injected {len(rewrites.get('summary', []))} summary and {len(rewrites.get('experience', []))} experience updates.")
+        return final_buf.getvalue()
+
+    def close(self) -> None:
+        self.doc.close()
+
+    def __enter__(self) -> "PdfResume":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
 def inject_pdf_rewrites(
     file_path_or_bytes,
     rewrites: dict,   # {"summary": [...new texts...], "experience": [...]}
@@ -154,110 +324,52 @@ def inject_pdf_rewrites(
 
     Returns bytes of the modified PDF.
     """
-    if isinstance(file_path_or_bytes, bytes):
-        doc = fitz.open(stream=file_path_or_bytes, filetype="pdf")
-    else:
-        doc = fitz.open(file_path_or_bytes)
+    with PdfResume(file_path_or_bytes) as resume:
+        return resume.inject(rewrites, tolerance)
 
-    # We need to re-extract to get fresh rect mappings
-    if isinstance(file_path_or_bytes, bytes):
-        sections = extract_pdf_sections(file_path_or_bytes)
-    else:
-        with open(file_path_or_bytes, "rb") as f:
-            sections = extract_pdf_sections(f.read())
-
-    for section_name in ("summary", "experience"):
-        entries = sections.get(section_name, [])
-        new_texts = rewrites.get(section_name, [])
-
-        # Add redactions for all entries in this section
-        for i, entry in enumerate(entries):
-            if i >= len(new_texts):
-                break
-
-            page = doc[entry["page"]]
-            rect = fitz.Rect(entry["rect"])
-            original_text = entry["text"]
-            new_text = new_texts[i]
-
-            # Enforce ±5% length constraint
-            new_text = enforce_length_constraint(original_text, new_text, tolerance)
-
-            # Step 1: Redact (erase) the original text area
-            # Use white fill to blank the area cleanly
-            page.add_redact_annot(rect, fill=(1, 1, 1))
-
-    # Apply all redactions on each page before inserting new text
-    for page in doc:
-        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
-
-    # Step 2: Re-open to re-get pages (apply_redactions modifies in-place)
-    # Re-extract to get updated state — actually we insert AFTER apply_redactions
-    # So we reload the document from bytes
-    buf = io.BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-
-    doc2 = fitz.open(stream=buf.read(), filetype="pdf")
-
-    # Re-extract section entries for positioning
-    buf.seek(0)
-    if isinstance(file_path_or_bytes, bytes):
-        sections = extract_pdf_sections(file_path_or_bytes)
-    else:
-        with open(file_path_or_bytes, "rb") as f:
-            sections = extract_pdf_sections(f.read())
-
-    for section_name in ("summary", "experience"):
-        entries = sections.get(section_name, [])
-        new_texts = rewrites.get(section_name, [])
-
-        for i, entry in enumerate(entries):
-            if i >= len(new_texts):
-                break
-
-            page = doc2[entry["page"]]
-            rect = fitz.Rect(entry["rect"])
-            original_text = entry["text"]
-            new_text = new_texts[i]
-
-            new_text = enforce_length_constraint(original_text, new_text, tolerance)
-
-            fontname = _map_font(entry.get("fontname", "Helvetica"))
-            fontsize = entry.get("fontsize", 11.0)
-
-            # Decode color from integer (0xRRGGBB) to float tuple
-            raw_color = entry.get("color", 0)
-            r = ((raw_color >> 16) & 0xFF) / 255.0
-            g = ((raw_color >> 8) & 0xFF) / 255.0
-            b = (raw_color & 0xFF) / 255.0
-
-            # Insert text at the exact origin of the original span to minimize jitter
-            origin = entry.get("origin", (rect.x0, rect.y1))
-            page.insert_text(
-                origin,
-                new_text,
-                fontname=fontname,
-                fontsize=fontsize,
-                color=(r, g, b),
-            )
-
-    final_buf = io.BytesIO()
-    doc2.save(final_buf)
-    final_buf.seek(0)
-    doc2.close()
-    print(f"[PDF] Injected {len(rewrites.get('summary', []))} summary and {len(rewrites.get('experience', []))} experience updates.")
-    return final_buf.read()
+
+# PyMuPDF is not thread-safe, even across separate documents. Any MuPDF
+# work handed to a thread goes through run_mupdf_in_thread, so threads take
+# turns on this one lock while the event loop stays free. Parser pool
+# workers are separate single-threaded processes and don't need it.
+MUPDF_LOCK = threading.Lock()
+
+
+def _call_locked(func, args):
+    with MUPDF_LOCK:
+        return func(*args)
+
+
+async def run_mupdf_in_thread(func, *args):
+    """Runs func(*args) in a worker thread while holding MUPDF_LOCK."""
+    return await asyncio.to_thread(_call_locked, func, args)
+
+
+async def inject_pdf_rewrites_async(
+    file_path_or_bytes,
+    rewrites: dict,
+    tolerance: float = 0.05,
+) -> bytes:
+    """
+    inject_pdf_rewrites in a worker thread, so async handlers don't block
+    the event loop on redaction and save.
+    """
+    return await run_mupdf_in_thread(inject_pdf_rewrites, file_path_or_bytes, rewrites, tolerance)
 
 
 def get_full_pdf_text(file_path_or_bytes) -> str:
-    """Returns all text content from a PDF file."""
-    if isinstance(file_path_or_bytes, bytes):
-        doc = fitz.open(stream=file_path_or_bytes, filetype="pdf")
-    else:
-        doc = fitz.open(file_path_or_bytes)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    doc.close()
+    """Returns all text content from a PDF file (cached by content hash)."""
+    data = _read_pdf_bytes(file_path_or_bytes)
+    key = _digest(data)
+    text = _TEXT_CACHE.get(key)
+    if text is None:
+        doc = _open_pdf(data)
+        text = get_pdf_text(doc)
+        doc.close()
+        _TEXT_CACHE[key] = text
     return text
+
+
+def get_pdf_text(doc: fitz.Document) -> str:
+    """Returns all text content from an already-open PDF document."""
+    return "".join(page.get_text() for page in doc)
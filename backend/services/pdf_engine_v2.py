@@ -7,6 +7,22 @@ import re
 import fitz
 from typing import Dict
 
+SUMMARY_HEADS = frozenset({"summary", "profile", "objective", "about", "overview", "statement", "background", "professional summary", "professional profile", "career objective"})
+EXP_HEADS = frozenset({"experience", "history", "employment", "work", "career", "professional experience", "work experience", "professional history", "employment history"})
+STOP_HEADS = frozenset({"education", "skills", "certifications", "certs", "projects", "awards", "references", "languages", "links", "interests", "volunteering", "publications", "affiliations", "academic", "training", "hobbies"})
+
+# Every header mapped to (priority, section) so a line needs one dict probe
+# per word instead of three set intersections; summary > experience > stop
+_HEAD_MAP = {
+    head: (rank, section)
+    for rank, (section, heads) in enumerate((("summary", SUMMARY_HEADS), ("experience", EXP_HEADS), ("stop", STOP_HEADS)))
+    for head in heads
+}
+
+_NON_ALPHA_RE = re.compile(r'[^a-z]')
+# Same substitution as a byte table for ASCII lines (one C pass, no regex)
+_NON_ALPHA_TABLE = bytes(b if 0x61 <= b <= 0x7A else 0x20 for b in range(256))
+
 def find_resume_sections(doc: fitz.Document) -> Dict[str, any]:
     """
     Identifies Summary and Experience sections in the PDF.
@@ -14,11 +30,8 @@ def find_resume_sections(doc: fitz.Document) -> Dict[str, any]:
     sections = {"summary": [], "experience": []}
     current_section = None
     
-    SUMMARY_HEADS = {"summary", "profile", "objective", "about", "overview", "statement", "background", "professional summary", "professional profile", "career objective"}
-    EXP_HEADS = {"experience", "history", "employment", "work", "career", "professional experience", "work experience", "professional history", "employment history"}
-    STOP_HEADS = {"education", "skills", "certifications", "certs", "projects", "awards", "references", "languages", "links", "interests", "volunteering", "publications", "affiliations", "academic", "training", "hobbies"}
-
     all_text_parts = []
+    append = all_text_parts.append
 
     for page_num, page in enumerate(doc):
         text_dict = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)
@@ -34,37 +47,28 @@ def find_resume_sections(doc: fitz.Document) -> Dict[str, any]:
                 full_line_text = "".join(s["text"] for s in spans).strip()
                 if not full_line_text: continue
                 
-                norm_text = re.sub(r'[^a-z]', ' ', full_line_text.lower()).strip()
-                words_list = norm_text.split()
-                words_set = set(words_list)
-                condensed = norm_text.replace(" ", "")
+                lowered = full_line_text.lower()
+                if lowered.isascii():
+                    norm_text = lowered.encode().translate(_NON_ALPHA_TABLE).decode().strip()
+                else:
+                    norm_text = _NON_ALPHA_RE.sub(' ', lowered).strip()
 
                 # Section detection (Header check)
                 is_header = False
                 # Stricter header detection: usually headers are short and alone on a line
                 if 1 <= len(norm_text) <= 40:
-                    found_sum = (words_set & SUMMARY_HEADS) or (condensed in SUMMARY_HEADS)
-                    found_exp = (words_set & EXP_HEADS) or (condensed in EXP_HEADS)
-                    found_stop = (words_set & STOP_HEADS) or (condensed in STOP_HEADS)
+                    hits = [_HEAD_MAP[w] for w in norm_text.split() if w in _HEAD_MAP]
+                    condensed = _HEAD_MAP.get(norm_text.replace(" ", ""))
+                    if condensed:
+                        hits.append(condensed)
 
-                    if found_sum:
+                    if hits:
                         # Before switching section, commit collected block lines to OLD section
                         prev_text = " ".join(block_lines).strip()
                         if prev_text and current_section:
                             sections[current_section].append({"text": prev_text})
-                        current_section = "summary"
-                        is_header = True
-                    elif found_exp:
-                        prev_text = " ".join(block_lines).strip()
-                        if prev_text and current_section:
-                            sections[current_section].append({"text": prev_text})
-                        current_section = "experience"
-                        is_header = True
-                    elif found_stop:
-                        prev_text = " ".join(block_lines).strip()
-                        if prev_text and current_section:
-                            sections[current_section].append({"text": prev_text})
-                        current_section = None
+                        section = min(hits)[1]
+                        current_section = section if section != "stop" else None
                         is_header = True
                 
                 if is_header:
@@ -78,7 +82,7 @@ def find_resume_sections(doc: fitz.Document) -> Dict[str, any]:
             if full_block_text:
                 if current_section:
                     sections[current_section].append({"text": full_block_text})
-                all_text_parts.append(full_block_text)
+                append(full_block_text)
 
     sections["all_text"] = "\n".join(all_text_parts)
     return sections
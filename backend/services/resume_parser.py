@@ -0,0 +1,27 @@
+"""
+Resume parsing entry point for the parser process pool.
+Kept free of FastAPI / LLM imports so pool workers only load what parsing
+needs (MuPDF, python-docx) instead of the whole application.
+"""
+
+import fitz
+
+from services.docx_engine import extract_docx_sections, get_docx_text
+from services.pdf_engine import get_pdf_text
+from services.pdf_engine_v2 import find_resume_sections
+
+
+def parse_resume(ext: str, file_bytes: bytearray) -> tuple[dict, str]:
+    """
+    Extracts (sections, full_text) from the resume.
+    Runs inside the parser process pool, so it only returns picklable data.
+    """
+    if ext == "docx":
+        sections, doc = extract_docx_sections(file_bytes, return_doc=True)
+        return sections, get_docx_text(doc)
+
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    try:
+        return find_resume_sections(doc), get_pdf_text(doc)
+    finally:
+        doc.close()
@@ -8,6 +8,12 @@ from bs4 import BeautifulSoup
 import re
 from typing import Optional
 
+try:
+    import lxml  # noqa: F401  C parser, much faster than html.parser on large pages
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 
 HEADERS = {
     "User-Agent": (
@@ -18,6 +24,12 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+_NEWLINES_RE = re.compile(r"\n{3,}")
+
+# Shared session so repeat scrapes reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+
 # Ordered list of CSS selectors per site type
 SELECTORS = [
     # LinkedIn
@@ -48,7 +60,7 @@ def scrape_jd(url: str, timeout: int = 10) -> dict:
         }
     """
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
+        resp = _SESSION.get(url, timeout=timeout)
         resp.raise_for_status()
     except requests.RequestException as e:
         return {
@@ -58,7 +70,8 @@ def scrape_jd(url: str, timeout: int = 10) -> dict:
             "error": f"Failed to fetch URL: {str(e)}",
         }
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    # Raw bytes: the parser sniffs the encoding itself, skipping a decode
+    soup = BeautifulSoup(resp.content, HTML_PARSER)
 
     title = ""
     description = ""
@@ -85,7 +98,7 @@ def scrape_jd(url: str, timeout: int = 10) -> dict:
         title = soup.title.string if soup.title else "Job Posting"
 
     # Clean up whitespace
-    description = re.sub(r"\n{3,}", "\n\n", description).strip()
+    description = _NEWLINES_RE.sub("\n\n", description).strip()
 
     return {
         "title": title,
@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Add backend to path so we can import services
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.ats_scorer import keyword_lines
+from services.llm import _trim_jd
+
+JD = """Senior Backend Engineer
+About Us
+We are a fast-growing fintech company on a mission to make payments simple.
+Our culture values ownership, curiosity and kindness.
+
+Responsibilities
+- Design and build backend services in Golang
+- Run and scale workloads on Kubernetes
+- Own data models in PostgreSQL
+- Mentor engineers and review code
+
+Requirements
+• 5+ years of backend engineering experience
+• Experience with Kafka or similar streaming systems
+1. Familiarity with Terraform
+2) AWS certification is a plus
+
+Benefits
+Competitive salary, equity and unlimited PTO.
+We are an equal opportunity employer and value diversity at our company.
+"""
+
+REQUIREMENTS = [
+    "- Design and build backend services in Golang",
+    "- Run and scale workloads on Kubernetes",
+    "- Own data models in PostgreSQL",
+    "- Mentor engineers and review code",
+    "• 5+ years of backend engineering experience",
+    "• Experience with Kafka or similar streaming systems",
+    "1. Familiarity with Terraform",
+    "2) AWS certification is a plus",
+]
+
+
+def test_requirement_bullets_naming_a_skill_once_are_kept():
+    lines = keyword_lines(JD)
+    for line in REQUIREMENTS:
+        assert line in lines
+
+
+def test_whitespace_is_collapsed_and_blank_lines_dropped():
+    assert keyword_lines("-   Go\n\n   \n-\tSQL  ") == ["- Go", "- SQL"]
+
+
+def test_jd_within_budget_is_sent_untouched():
+    assert _trim_jd(JD, 4000) == JD
+
+
+def test_jd_over_budget_keeps_requirements_first():
+    long_jd = JD + "\n".join(["Lorem ipsum dolor sit amet consectetur adipiscing elit."] * 200)
+    trimmed = _trim_jd(long_jd, 4000)
+    assert len(trimmed.encode("utf-8")) <= 4000
+    for line in REQUIREMENTS:
+        assert line in trimmed
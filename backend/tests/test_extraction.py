@@ -2,6 +2,7 @@
 import sys
 import os
 import re
+from functools import lru_cache
 
 # Add backend to path so we can import services
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -24,17 +25,20 @@ class MockDoc:
     def __iter__(self):
         return iter(self._pages)
 
+@lru_cache(maxsize=None)
+def _line(text):
+    # The extractor only reads span dicts, so identical lines share one cached dict
+    return {"spans": [{"text": text}]}
+
 def test_template(name, pages_data):
     print(f"\n--- Testing Template: {name} ---")
-    mock_pages = []
-    for page_blocks in pages_data:
-        blocks = []
-        for block_text in page_blocks:
-            lines = []
-            for line_text in block_text.split('\n'):
-                lines.append({"spans": [{"text": line_text}]})
-            blocks.append({"type": 0, "lines": lines})
-        mock_pages.append(MockPage(blocks))
+    mock_pages = [
+        MockPage([
+            {"type": 0, "lines": [_line(line_text) for line_text in block_text.split('\n')]}
+            for block_text in page_blocks
+        ])
+        for page_blocks in pages_data
+    ]
     
     mock_doc = MockDoc(mock_pages)
     sections = find_resume_sections(mock_doc)
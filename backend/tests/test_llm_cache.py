@@ -0,0 +1,89 @@
+import sys
+import os
+import asyncio
+
+# Add backend to path so we can import services
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import orjson
+
+from services.llm_cache import LLMCache
+
+
+def test_hits_return_independent_copies():
+    cache = LLMCache(None)
+    cache.put("k", {"skills": ["go"]})
+    cache.get("k")["skills"].append("rust")
+    assert cache.get("k") == {"skills": ["go"]}
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(None, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.llm_cache.time.time", lambda: now[0])
+    cache = LLMCache(None, ttl=60)
+    cache.put("k", "v")
+    now[0] += 59
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k") is None
+    assert cache.misses == 1
+
+
+def test_reload_from_disk_skips_expired_entries(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    now = [1000.0]
+    monkeypatch.setattr("services.llm_cache.time.time", lambda: now[0])
+    cache = LLMCache(path, ttl=60)
+    cache.put("old", 1)
+    now[0] += 30
+    cache.put("new", {"score": 80})
+
+    now[0] += 40  # "old" has expired, "new" has not
+    reloaded = LLMCache(path, ttl=60)
+    assert reloaded.get("new") == {"score": 80}
+    assert reloaded.get("old") is None
+
+
+def test_unreadable_or_legacy_file_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_bytes(b"{not json")
+    assert LLMCache(str(path)).get("k") is None
+    path.write_bytes(orjson.dumps({"k": {"score": 1}}))
+    assert LLMCache(str(path)).get("k") is None
+
+
+def test_no_file_is_written_without_a_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    LLMCache(None).put("k", "v")
+    assert os.listdir(tmp_path) == []
+
+
+def test_puts_inside_event_loop_are_debounced(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    writes = []
+    original = LLMCache._write
+    monkeypatch.setattr(LLMCache, "_write", lambda self, body: (writes.append(body), original(self, body)))
+
+    async def burst():
+        cache = LLMCache(path, save_delay=60)
+        for i in range(50):
+            cache.put(str(i), i)
+        await asyncio.sleep(0)
+        assert writes == []  # nothing written until the quiet period ends or a flush
+        await cache.flush()
+
+    asyncio.run(burst())
+    assert len(writes) == 1
+    assert LLMCache(path).get("49") == 49
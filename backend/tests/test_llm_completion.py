@@ -0,0 +1,140 @@
+import sys
+import os
+import asyncio
+
+# Add backend to path so we can import services
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import orjson
+import pytest
+
+import services.llm as llm
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    """Routes Groq calls to `groq.reply(payload)`; every request payload lands in groq.calls."""
+    class Groq:
+        calls = []
+        reply = None
+
+    def handler(request):
+        payload = orjson.loads(request.content)
+        Groq.calls.append(payload)
+        status, body, *raw = Groq.reply(payload)
+        if raw:
+            return httpx.Response(status, content=raw[0])
+        return httpx.Response(status, json=body)
+
+    monkeypatch.setattr(llm, "_client", httpx.AsyncClient(base_url=llm.GROQ_BASE_URL, transport=httpx.MockTransport(handler)))
+    return Groq
+
+
+def _choice(content, finish_reason="stop"):
+    return 200, {"choices": [{"message": {"content": content}, "finish_reason": finish_reason}]}
+
+
+def test_rewrite_budget_has_a_floor_and_a_cap():
+    assert llm._rewrite_max_tokens([]) == llm.REWRITE_MIN_TOKENS
+    assert llm._rewrite_max_tokens(["x" * 300]) == llm.REWRITE_MIN_TOKENS
+    assert llm._rewrite_max_tokens(["x" * 500] * 30, extra=llm.SCORE_MAX_TOKENS) == llm.MAX_COMPLETION_TOKENS
+
+
+def test_truncated_completion_is_retried_with_full_budget(groq):
+    groq.reply = lambda p: _choice('{"a": 1}') if p["max_tokens"] == llm.MAX_COMPLETION_TOKENS else _choice('{"a":', "length")
+    assert asyncio.run(llm._post_completion({"model": "m", "max_tokens": 1024})) == '{"a": 1}'
+    assert [c["max_tokens"] for c in groq.calls] == [1024, llm.MAX_COMPLETION_TOKENS]
+
+
+def test_truncation_at_full_budget_is_not_retried(groq):
+    groq.reply = lambda p: _choice('{"a":', "length")
+    assert asyncio.run(llm._post_completion({"model": "m", "max_tokens": llm.MAX_COMPLETION_TOKENS})) == '{"a":'
+    assert len(groq.calls) == 1
+
+
+def test_resume_without_experience_is_scored_by_the_small_model(groq):
+    groq.reply = lambda p: _choice(orjson.dumps({"total": 64, "top_matched_keywords": ["python"], "missing_keywords": ["go"]}).decode())
+    sections = {"summary": [{"text": "Python developer"}], "experience": []}
+    analysis, score = asyncio.run(llm.analyze_resume(sections, "Python developer, unique-1", "Go developer"))
+    assert [c["model"] for c in groq.calls] == [llm.SCORING_MODEL]
+    assert score["total"] == 64
+    assert analysis == {"existing_skills": ["python"], "missing_skills": ["go"], "experience_suggestions": []}
+
+
+def test_unusable_small_model_score_falls_back_to_none(groq):
+    groq.reply = lambda p: _choice("not json")
+    events = []
+
+    async def collect():
+        async for event in llm.stream_analyze_resume({"experience": []}, "unique-2", "Go developer"):
+            events.append(event)
+
+    asyncio.run(collect())
+    assert events == [("result", ({"existing_skills": [], "missing_skills": [], "experience_suggestions": []}, None))]
+
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_small_model_http_error_falls_back_to_none(groq, status):
+    groq.reply = lambda p: (status, {"error": {"message": "busy"}})
+    sections = {"summary": [], "experience": []}
+    analysis, score = asyncio.run(llm.analyze_resume(sections, f"unique-http-{status}", "Go developer"))
+    assert score is None
+    assert analysis["experience_suggestions"] == []
+
+def _sections():
+    return {"experience": [{"text": "Built APIs at Foo."}]}
+
+
+def test_json_mode_requests_carry_no_stop_sequences(groq):
+    groq.reply = lambda p: _choice('{"score": {"total": 70}, "experience_suggestions": []}')
+    asyncio.run(llm.analyze_resume(_sections(), "unique-3", "Go developer"))
+    assert groq.calls[0]["response_format"] == llm.JSON_MODE
+    assert "stop" not in groq.calls[0]
+
+
+def test_json_validate_failed_is_retried_in_plain_mode(groq):
+    def reply(payload):
+        if "response_format" in payload:
+            return 400, {"error": {"code": "json_validate_failed", "message": "bad json"}}
+        return _choice('```json\n{"score": {"total": 70}, "experience_suggestions": []}')
+
+    groq.reply = reply
+    analysis, score = asyncio.run(llm.analyze_resume(_sections(), "unique-4", "Go developer"))
+    assert score["total"] == 70
+    assert len(groq.calls) == 2
+    assert groq.calls[1]["stop"] == llm.STOP_SEQUENCES
+
+
+def test_other_400s_are_raised(groq):
+    groq.reply = lambda p: (400, {"error": {"code": "context_length_exceeded"}})
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(llm.analyze_resume(_sections(), "unique-5", "Go developer"))
+    assert len(groq.calls) == 1
+
+
+def test_streamed_request_drops_json_mode(groq):
+    content = '{"score": {"total": 70}, "experience_suggestions": [{"original": "a", "suggested": "b"}]}'
+
+    def reply(payload):
+        chunk = {"choices": [{"delta": {"content": content}, "finish_reason": "stop"}]}
+        return 200, None, b"data: " + orjson.dumps(chunk) + b"\n\ndata: [DONE]\n\n"
+
+    groq.reply = reply
+    events = []
+
+    async def collect():
+        async for event in llm.stream_analyze_resume(_sections(), "unique-6", "Go developer"):
+            events.append(event)
+
+    asyncio.run(collect())
+    assert "response_format" not in groq.calls[0]
+    assert groq.calls[0]["stream"] is True
+    assert events[0] == ("suggestion", {"original": "a", "suggested": "b"})
+    assert events[-1][1][1]["total"] == 70
+
+
+def test_fenced_plain_mode_output_still_parses():
+    assert llm._parse_json('Here you go:\n```json\n{"a": 1}\n') == {"a": 1}
+    assert llm._parse_json("no json here") is None
@@ -0,0 +1,58 @@
+import sys
+import os
+import json
+
+# Add backend to path so we can import services
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from services.llm import _ArrayItemScanner
+
+ITEMS = [
+    {"original": 'Led the "Core" team', "suggested": "Led the \\ platform team"},
+    {"original": "Café rollout — v2", "suggested": "Shipped {braces} and [brackets]"},
+]
+DOCUMENT = json.dumps({"total": 80, "experience_suggestions": ITEMS, "feedback": "ok"})
+
+
+def _scan(chunks):
+    scanner = _ArrayItemScanner("experience_suggestions")
+    emitted = []
+    for chunk in chunks:
+        emitted.append(scanner.feed(chunk))
+    return scanner, emitted
+
+
+def test_char_by_char_yields_every_item_once():
+    _, emitted = _scan(list(DOCUMENT))
+    assert [item for batch in emitted for item in batch] == ITEMS
+
+
+def test_item_is_emitted_as_soon_as_it_closes():
+    end_of_first = DOCUMENT.index("}", DOCUMENT.index("platform")) + 1
+    _, emitted = _scan([DOCUMENT[:end_of_first], DOCUMENT[end_of_first:]])
+    assert emitted == [ITEMS[:1], ITEMS[1:]]
+
+
+@pytest.mark.parametrize("needle", ['\\"Core', "\\\\ platform", "\\u00e9", "[brackets]"])
+def test_split_mid_string_and_mid_escape(needle):
+    raw = json.dumps({"experience_suggestions": ITEMS}, ensure_ascii=True)
+    assert needle in raw
+    for offset in range(len(needle) + 1):
+        cut = raw.index(needle) + offset
+        _, emitted = _scan([raw[:cut], raw[cut:]])
+        assert [item for batch in emitted for item in batch] == ITEMS
+
+
+def test_closing_bracket_stops_scanning():
+    scanner, emitted = _scan([DOCUMENT])
+    assert emitted == [ITEMS]
+    # Later objects outside the array are never reported
+    assert scanner.feed(', "extra": [{"original": "x"}]}') == []
+
+
+def test_marker_split_across_chunks():
+    cut = DOCUMENT.index("experience_suggestions") + 5
+    _, emitted = _scan([DOCUMENT[:cut], DOCUMENT[cut:]])
+    assert [item for batch in emitted for item in batch] == ITEMS
@@ -0,0 +1,34 @@
+import sys
+import os
+
+# Add backend to path so we can import services
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routers.optimize as optimize
+from services.pdf_engine import MUPDF_LOCK
+
+
+def test_parse_without_pool_holds_the_mupdf_lock(monkeypatch):
+    held = []
+
+    def fake_parse(ext, file_bytes):
+        held.append(MUPDF_LOCK.locked())
+        return {"summary": [], "experience": []}, "Jane Doe"
+
+    async def fake_analyze(sections, full_text, jd):
+        return {"experience_suggestions": []}, {"total": 50}
+
+    monkeypatch.setattr(optimize, "parse_resume", fake_parse)
+    monkeypatch.setattr(optimize, "analyze_resume", fake_analyze)
+    app = FastAPI()  # no lifespan, so no parser pool
+    app.include_router(optimize.router, prefix="/api")
+    response = TestClient(app).post(
+        "/api/optimize",
+        files={"file": ("resume.pdf", b"%PDF-fallback", "application/pdf")},
+        data={"jd_text": "Python developer"},
+    )
+    assert response.status_code == 200
+    assert held == [True]
@@ -0,0 +1,63 @@
+import sys
+import os
+import asyncio
+import time
+
+# Add backend to path so we can import services
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+
+from services.pdf_engine import _extract_from_doc, run_mupdf_in_thread, MUPDF_LOCK
+from services.resume_parser import parse_resume
+
+
+def _doc(*pages):
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        for i, text in enumerate(lines):
+            page.insert_text((72, 72 + 20 * i), text)
+    return doc
+
+
+def test_headers_after_stop_on_the_same_page_are_honoured():
+    doc = _doc(["SUMMARY", "Backend engineer.", "EXPERIENCE", "Built APIs at Foo.",
+                "EDUCATION", "BSc CS.", "Volunteer Experience", "Mentored students weekly."])
+    sections = _extract_from_doc(doc)
+    assert list(sections["experience"]["text"]) == ["Built APIs at Foo.", "Mentored students weekly."]
+
+
+def test_later_pages_are_skipped_until_a_target_returns():
+    doc = _doc(["SUMMARY", "Backend engineer.", "EXPERIENCE", "Built APIs at Foo.", "EDUCATION", "BSc CS."],
+               ["SKILLS", "Go"],
+               ["EXPERIENCE", "Later job."])
+    sections = _extract_from_doc(doc)
+    assert list(sections["experience"]["text"]) == ["Built APIs at Foo.", "Later job."]
+    assert list(sections["experience"]["page"]) == [0, 2]
+    assert "Go" in sections["all_text"]
+
+
+def test_full_text_keeps_headers_and_every_line():
+    doc = _doc(["Jane Doe", "SUMMARY", "Backend engineer.", "EXPERIENCE", "Built APIs at Foo.", "SKILLS", "Go, SQL"])
+    sections, full_text = parse_resume("pdf", doc.tobytes())
+    for line in ("Jane Doe", "SUMMARY", "EXPERIENCE", "SKILLS", "Go, SQL"):
+        assert line in full_text
+    assert sections["experience"]
+
+
+def test_mupdf_threads_take_turns():
+    active, overlaps = [], []
+
+    def work(i):
+        assert MUPDF_LOCK.locked()
+        active.append(i)
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        active.remove(i)
+
+    async def run():
+        await asyncio.gather(*(run_mupdf_in_thread(work, i) for i in range(4)))
+
+    asyncio.run(run())
+    assert overlaps == [1, 1, 1, 1]
@@ -0,0 +1,101 @@
+import sys
+import os
+
+# Add backend to path so we can import utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils.static_cache import (
+    load_assets,
+    asset_response,
+    brotli,
+    ASSET_CACHE_CONTROL,
+    INDEX_CACHE_CONTROL,
+)
+
+APP_JS = b"console.log('hello');\n" * 50
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "index.html").write_bytes(b"<html><body>app</body></html>")
+    (tmp_path / "app.js").write_bytes(APP_JS)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG fake")
+    assets = load_assets(str(tmp_path))
+
+    app = FastAPI()
+
+    @app.get("/{path:path}")
+    def serve(path: str, request: Request):
+        return asset_response(assets[path], request)
+
+    return TestClient(app)
+
+
+def _get(client, path, **headers):
+    return client.get("/" + path, headers={"accept-encoding": "identity", **headers})
+
+
+def test_index_revalidates_and_assets_are_cacheable(client):
+    assert _get(client, "index.html").headers["cache-control"] == INDEX_CACHE_CONTROL
+    assert _get(client, "logo.png").headers["cache-control"] == ASSET_CACHE_CONTROL
+
+
+def test_matching_etag_returns_304(client):
+    etag = _get(client, "logo.png").headers["etag"]
+    response = _get(client, "logo.png", **{"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("template", ["W/{etag}", '"other", {etag}', "*"])
+def test_weak_list_and_wildcard_etags_match(client, template):
+    etag = _get(client, "logo.png").headers["etag"]
+    response = _get(client, "logo.png", **{"if-none-match": template.format(etag=etag)})
+    assert response.status_code == 304
+
+
+def test_stale_etag_returns_body(client):
+    response = _get(client, "logo.png", **{"if-none-match": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == b"\x89PNG fake"
+
+
+def test_identity_request_gets_uncompressed_body(client):
+    response = _get(client, "app.js")
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == APP_JS
+
+
+def test_gzip_variant_has_its_own_etag(client):
+    plain = _get(client, "app.js")
+    response = client.get("/app.js", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] != plain.headers["etag"]
+    assert response.content == APP_JS  # httpx decodes transparently
+    # The identity ETag must not validate the gzip variant
+    stale = client.get("/app.js", headers={"accept-encoding": "gzip", "if-none-match": plain.headers["etag"]})
+    assert stale.status_code == 200
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli not installed")
+def test_brotli_preferred_over_gzip(client):
+    response = client.get("/app.js", headers={"accept-encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+
+
+@pytest.mark.parametrize("header", ["br;q=0, gzip", "br; q=0.0, gzip"])
+def test_refused_encoding_is_skipped(client, header):
+    response = client.get("/app.js", headers={"accept-encoding": header})
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_non_text_assets_are_not_compressed(client):
+    response = client.get("/logo.png", headers={"accept-encoding": "gzip, br"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
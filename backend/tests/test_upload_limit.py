@@ -0,0 +1,39 @@
+import sys
+import os
+import io
+import asyncio
+
+# Add backend to path so we can import services
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from fastapi import FastAPI, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from routers.optimize import router, _read_upload, MAX_RESUME_BYTES
+
+
+def _read(size):
+    return asyncio.run(_read_upload(UploadFile(file=io.BytesIO(b"x" * size), filename="r.pdf")))
+
+
+def test_upload_at_limit_is_accepted():
+    assert len(_read(MAX_RESUME_BYTES)) == MAX_RESUME_BYTES
+
+
+def test_upload_one_byte_over_limit_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        _read(MAX_RESUME_BYTES + 1)
+    assert exc.value.status_code == 413
+
+
+def test_endpoint_returns_413_before_parsing():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    client = TestClient(app)
+    response = client.post(
+        "/api/optimize",
+        files={"file": ("resume.pdf", b"x" * (MAX_RESUME_BYTES + 1), "application/pdf")},
+        data={"jd_text": "Python developer"},
+    )
+    assert response.status_code == 413
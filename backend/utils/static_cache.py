@@ -0,0 +1,114 @@
+"""
+In-memory cache for the static frontend.
+Files are read once at startup and served with strong ETags so repeat
+visits short-circuit to 304 Not Modified without touching the disk.
+Text assets are also precompressed (brotli + gzip) once at startup and
+the best variant the client accepts is served from memory.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from email.utils import formatdate
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip still covers every browser
+    brotli = None
+
+ASSET_CACHE_CONTROL = "public, max-age=3600"
+# The SPA shell must revalidate so new deploys are picked up immediately
+INDEX_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_EXTENSIONS = (".js", ".css", ".html", ".svg")
+
+
+class StaticAsset:
+    __slots__ = ("body", "etag", "last_modified", "media_type", "cache_control", "variants")
+
+    def __init__(self, body: bytes, mtime: float, media_type: Optional[str], cache_control: str, compress: bool = False):
+        self.body = body
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.etag = '"' + digest + '"'
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.media_type = media_type or "application/octet-stream"
+        self.cache_control = cache_control
+        # Ordered by preference: [(content-encoding, body, etag)]
+        self.variants = []
+        if compress:
+            if brotli is not None:
+                self.variants.append(("br", brotli.compress(body, quality=11), '"' + digest + '-br"'))
+            self.variants.append(("gzip", gzip.compress(body, compresslevel=9), '"' + digest + '-gz"'))
+
+
+def load_assets(directory: str) -> Dict[str, StaticAsset]:
+    """
+    Walks `directory` once and returns {relative_posix_path: StaticAsset}.
+    """
+    assets = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, directory).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                body = f.read()
+            cache_control = INDEX_CACHE_CONTROL if rel == "index.html" else ASSET_CACHE_CONTROL
+            assets[rel] = StaticAsset(
+                body,
+                os.stat(path).st_mtime,
+                mimetypes.guess_type(name)[0],
+                cache_control,
+                compress=name.lower().endswith(COMPRESSIBLE_EXTENSIONS),
+            )
+    return assets
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag or candidate == "*":
+            return True
+    return False
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    encodings = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+def asset_response(asset: StaticAsset, request: Request) -> Response:
+    """Returns 304 if the client already holds this version, else the cached bytes."""
+    body, etag, encoding = asset.body, asset.etag, None
+    if asset.variants:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for coding, variant_body, variant_etag in asset.variants:
+            if coding in accepted:
+                body, etag, encoding = variant_body, variant_etag, coding
+                break
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": asset.last_modified,
+        "Cache-Control": asset.cache_control,
+    }
+    if asset.variants:
+        headers["Vary"] = "Accept-Encoding"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.media_type, headers=headers)
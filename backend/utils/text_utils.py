@@ -2,6 +2,11 @@
 Text utility helpers for the Resume Tailor engine.
 """
 
+import re
+
+_WS_RE = re.compile(r"[ \t]+")
+_NEWLINES_RE = re.compile(r"\n{3,}")
+
 def char_count_ratio(original: str, rewritten: str) -> float:
     """Returns the ratio of rewritten length to original length."""
     if len(original) == 0:
@@ -17,23 +22,22 @@ def enforce_length_constraint(
     If too long: truncate at the last word boundary within the limit.
     If too short: pad with a space (shouldn't normally happen with LLM output).
     """
-    max_len = int(len(original) * (1 + tolerance))
-    min_len = int(len(original) * (1 - tolerance))
-
-    if len(rewritten) > max_len:
-        # Truncate at last word boundary within limit
-        truncated = rewritten[:max_len]
-        last_space = truncated.rfind(" ")
-        if last_space > min_len:
-            return truncated[:last_space]
-        return truncated
+    original_len = len(original)
+    max_len = int(original_len * (1 + tolerance))
+    # Common case: the rewrite already fits, nothing to slice
+    if len(rewritten) <= max_len:
+        return rewritten
 
-    return rewritten
+    # Truncate at last word boundary within limit
+    min_len = int(original_len * (1 - tolerance))
+    last_space = rewritten.rfind(" ", 0, max_len)
+    if last_space > min_len:
+        return rewritten[:last_space]
+    return rewritten[:max_len]
 
 
 def clean_text(text: str) -> str:
     """Strips excessive whitespace while preserving single newlines."""
-    import re
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _WS_RE.sub(" ", text)
+    text = _NEWLINES_RE.sub("\n\n", text)
     return text.strip()